@@ -7,24 +7,28 @@ TP 1 & 2: Uses in-memory storage for simplicity
 TP 3: Will introduce PostgreSQL database (see migration guide)
 """
 from contextlib import asynccontextmanager
-import uuid 
+from cachetools import TTLCache
 from fastapi import Depends 
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from ulid import ULID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, insert, select, text, tuple_, update
 from .database import get_db, init_db 
 from .models import TaskModel, TaskStatus, TaskPriority # Utilise les modèles DB
 from fastapi.middleware.cors import CORSMiddleware
+import base64
+import binascii
 import os
 
 from typing import List, Optional
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import Body, FastAPI, HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 import logging
 
 # Configure logging
+# LOG_LEVEL (voir .env.example) : WARNING en production coupe les logs INFO du chemin chaud
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger("taskflow")
@@ -37,7 +41,8 @@ logger = logging.getLogger("taskflow")
 
 class TaskCreate(BaseModel):
     """Model for creating a new task."""
-    title: str = Field(..., min_length=1, max_length=200, description="Task title")
+    # pattern=r"\S" : refuse les titres vides ou blancs, vérifié par pydantic-core (Rust)
+    title: str = Field(..., min_length=1, max_length=200, pattern=r"\S", description="Task title")
     description: Optional[str] = Field(None, max_length=1000, description="Task description")
     # Utilise TaskStatus importé de .models
     status: TaskStatus = Field(default=TaskStatus.TODO, description="Task status") 
@@ -47,9 +52,13 @@ class TaskCreate(BaseModel):
     due_date: Optional[datetime] = Field(None, description="Due date")
 
 
+# Champs de TaskUpdate qui peuvent être omis mais pas mis à null
+NON_NULLABLE_UPDATE_FIELDS = ("title", "status", "priority")
+
+
 class TaskUpdate(BaseModel):
     """Model for updating a task - all fields optional for partial updates."""
-    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    title: Optional[str] = Field(None, min_length=1, max_length=200, pattern=r"\S")
     description: Optional[str] = Field(None, max_length=1000)
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
@@ -70,15 +79,61 @@ class Task(BaseModel):
     created_at: datetime 
     updated_at: datetime
 
-    class Config:
-        from_attributes = True # Permet la conversion depuis SQLAlchemy
+    model_config = ConfigDict(from_attributes=True) # Permet la conversion depuis SQLAlchemy
+
+
+# Adaptateurs construits une fois : validation + dump_json directement dans pydantic-core
+TASK_ADAPTER = TypeAdapter(Task)
+TASKS_ADAPTER = TypeAdapter(List[Task])
+
+
+def json_response(adapter: TypeAdapter, content, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """Valide `content` et le sérialise en JSON en une passe, sans jsonable_encoder ni response_model."""
+    body = adapter.dump_json(adapter.validate_python(content))
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def encode_cursor(created_at: datetime, task_id: str) -> str:
+    """Curseur opaque de pagination : (created_at, id) de la dernière tâche de la page."""
+    raw = f"{created_at.isoformat()}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Décode un curseur produit par encode_cursor ; HTTP 400 s'il est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, task_id = raw.split("|", 1)
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # created_at est stocké sans fuseau : une date "aware" (curseur modifié) ferait échouer asyncpg
+    if created_at.tzinfo is not None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, task_id
+
+
+# =============================================================================
+# REQUÊTES PRÉ-CONSTRUITES
+# =============================================================================
+# Construites une seule fois : SQLAlchemy réutilise leur forme compilée (cache de compilation)
+
+# Tri stable pour la pagination keyset : plus récentes d'abord, l'ID départage les ex-aequo
+# Select Core sur la table : lignes brutes, sans instances ORM ni identity map
+_STMT_TASKS = select(TaskModel.__table__).order_by(TaskModel.created_at.desc(), TaskModel.id.desc())
+_STMT_COUNT = select(func.count()).select_from(TaskModel)
+# PostgreSQL : estimation tenue à jour par VACUUM/ANALYZE, lue dans le catalogue sans parcourir la table
+_STMT_COUNT_ESTIMATE = text(
+    # to_regclass suit le search_path : pas de confusion avec une table "tasks" d'un autre schéma
+    "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table)"
+).bindparams(table=TaskModel.__tablename__)
 
 
 @asynccontextmanager 
 async def lifespan(app: FastAPI): 
     """Lifecycle manager initialise la DB au démarrage."""
     logger.info("🚀 TaskFlow backend starting up...")
-    init_db() # Crée les tables
+    await init_db() # Crée les tables
     logger.info("Database initialized") 
     yield 
     logger.info("🛑 TaskFlow backend shutting down...") 
@@ -97,18 +152,51 @@ app = FastAPI(
 )
 
 # Configuration CORS pour le frontend
-cors_origins_str = os.getenv("CORS_ORIGINS", "http://localhost:5173, http://127.0.0.1:5173") 
-cors_origins = [origin.strip() for origin in cors_origins_str.split(",")] 
+# Lue une seule fois à l'import : espaces retirés, entrées vides ("a,,b" ou virgule finale) ignorées
+CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173, http://127.0.0.1:5173").split(",")
+    if origin.strip()
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=cors_origins,
+    allow_origins=list(CORS_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Lisible par le frontend pour charger la page suivante
 )
 
 
+async def get_task_by_id(db: AsyncSession, task_id: str) -> Optional[TaskModel]:
+    """Charge une tâche par ID.
+
+    db.get consulte d'abord l'identity map de la session : une tâche déjà lue pendant la requête
+    n'est pas relue en base, pas besoin de cache par requête en plus.
+    """
+    return await db.get(TaskModel, task_id)
+
+
+# =============================================================================
+# CACHE PROCESSUS (GET /tasks/{task_id})
+# =============================================================================
+# JSON des tâches récemment lues, propre à chaque worker. L'invalidation ne traverse pas les workers :
+# le cache n'est actif qu'avec un seul worker (WEB_CONCURRENCY <= 1), en attendant un cache partagé
+
+TASK_CACHE_ENABLED = int(os.getenv("WEB_CONCURRENCY", "1")) <= 1
+_TASK_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+# Compteur d'écritures par tâche : un GET qui chargeait pendant une écriture ne met pas en cache
+# une version périmée (TTL largement supérieur à la durée d'un chargement)
+_TASK_GENERATIONS: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def forget_task(task_id: str) -> None:
+    """Invalide la tâche dans le cache processus après une écriture."""
+    _TASK_GENERATIONS[task_id] = _TASK_GENERATIONS.get(task_id, 0) + 1
+    _TASK_CACHE.pop(task_id, None)
+
+
 # =============================================================================
 # ENDPOINTS
 # =============================================================================
@@ -123,12 +211,16 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)): # Injection de Session DB
+async def health_check(db: AsyncSession = Depends(get_db)): # Injection de Session DB
     """Health check with database status."""
     try:
         # Vérifie la connexion
-        db.execute(text("SELECT 1"))
-        tasks_count = db.query(TaskModel).count()
+        await db.execute(text("SELECT 1"))
+        # /health est sondé en continu : pas de COUNT(*) (parcours complet) sur PostgreSQL
+        if db.bind.dialect.name == "postgresql":
+            tasks_count = await db.scalar(_STMT_COUNT_ESTIMATE)
+        else:
+            tasks_count = await db.scalar(_STMT_COUNT)
         return {
             "status": "healthy",
             "database": "connected",
@@ -142,50 +234,77 @@ async def health_check(db: Session = Depends(get_db)): # Injection de Session DB
 # Le second endpoint, correct, est conservé ci-dessous.
 
 
-@app.get("/tasks", response_model=List[Task])
+@app.get("/tasks", response_model=None, responses={200: {"model": List[Task]}})
 async def get_tasks(
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
     assignee: Optional[str] = None,
-    db: Session = Depends(get_db) # Injection de Session DB
-) -> List[Task]:
-    """Get all tasks with optional filtering."""
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_db) # Injection de Session DB
+) -> Response:
+    """Get tasks with optional filtering, paginated by (created_at, id) keyset."""
     
-    query = db.query(TaskModel) # Démarrer la requête sur le modèle DB
+    stmt = _STMT_TASKS # Démarrer la requête sur la table
     
     # Appliquer les filtres SQLAlchemy
     if status:
-        query = query.filter(TaskModel.status == status)
+        stmt = stmt.where(TaskModel.status == status)
     if priority:
-        query = query.filter(TaskModel.priority == priority)
+        stmt = stmt.where(TaskModel.priority == priority)
     if assignee:
-        query = query.filter(TaskModel.assignee == assignee)
-
-    return query.all() # Exécuter la requête et retourner les résultats
-
-@app.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str, db: Session = Depends(get_db)) -> Task:
+        stmt = stmt.where(TaskModel.assignee == assignee)
+
+    # Pagination keyset : reprendre juste après la dernière tâche de la page précédente (sans OFFSET)
+    # Le curseur porte ses propres valeurs : il reste valide même si cette tâche a été supprimée depuis
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        # Comparaison de ligne (row value) : borne directe sur l'index ix_tasks_created_at_id
+        stmt = stmt.where(
+            tuple_(TaskModel.created_at, TaskModel.id) < (cursor_created_at, cursor_id)
+        )
+
+    result = await db.execute(stmt.limit(limit))
+    # Dictionnaires simples : validés et sérialisés en une passe par TASKS_ADAPTER
+    tasks = [dict(row) for row in result.mappings()]
+
+    # Page pleine : il peut rester des tâches, on indique où reprendre
+    headers = None
+    if len(tasks) == limit:
+        headers = {"X-Next-Cursor": encode_cursor(tasks[-1]["created_at"], tasks[-1]["id"])}
+    return json_response(TASKS_ADAPTER, tasks, headers=headers)
+
+@app.get("/tasks/{task_id}", response_model=None, responses={200: {"model": Task}})
+async def get_task(task_id: str, db: AsyncSession = Depends(get_db)) -> Response:
     """Get a single task by ID."""
     
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
-    
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    # Cache processus : aucune requête SQL ni sérialisation pour une tâche lue récemment
+    body = _TASK_CACHE.get(task_id) if TASK_CACHE_ENABLED else None
+    if body is None:
+        generation = _TASK_GENERATIONS.get(task_id, 0)
+        task = await get_task_by_id(db, task_id)
         
-    return task
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+            
+        # JSON déjà sérialisé, détaché de la session, réutilisable par les requêtes suivantes
+        body = TASK_ADAPTER.dump_json(TASK_ADAPTER.validate_python(task))
+        # Une écriture a eu lieu pendant le chargement : ce JSON est peut-être déjà périmé
+        if TASK_CACHE_ENABLED and _TASK_GENERATIONS.get(task_id, 0) == generation:
+            _TASK_CACHE[task_id] = body
+
+    return Response(body, media_type="application/json")
 
 
-@app.post("/tasks", response_model=Task, status_code=201)
-async def create_task(task_data: TaskCreate, db: Session = Depends(get_db)) -> Task:
+@app.post("/tasks", response_model=None, status_code=201, responses={201: {"model": Task}})
+async def create_task(task_data: TaskCreate, db: AsyncSession = Depends(get_db)) -> Response:
     """Create a new task."""
     
-    # 1. Validation 
-    if not task_data.title or not task_data.title.strip():
-        raise HTTPException(status_code=422, detail="Title cannot be empty")
+    # 1. Validation : titre vide/blanc déjà rejeté (422) par le schéma TaskCreate
 
-    # 2. Créer un TaskModel avec un UUID
+    # 2. Créer un TaskModel avec un ULID
     task = TaskModel(
-        id=str(uuid.uuid4()), # Utilise UUID pour l'ID
+        id=str(ULID()), # ULID : triable par date de création, insertions groupées en fin d'index B-tree
         title=task_data.title,
         description=task_data.description,
         status=task_data.status,
@@ -196,56 +315,95 @@ async def create_task(task_data: TaskCreate, db: Session = Depends(get_db)) -> T
 
     # 3. Ajouter à la session, commiter, et rafraîchir
     db.add(task)
-    db.commit()
-    db.refresh(task) # Recharge l'objet pour obtenir les timestamps
+    await db.commit()
+    await db.refresh(task) # Recharge l'objet pour obtenir les timestamps
+
+    logger.info("Task created successfully: %s", task.id) # Formatage différé : ignoré si INFO est coupé
+    return json_response(TASK_ADAPTER, task, status_code=201)
+
+@app.post("/tasks:bulk", response_model=None, status_code=201, responses={201: {"model": List[Task]}})
+async def create_tasks_bulk(
+    tasks_data: List[TaskCreate] = Body(..., min_length=1, max_length=500),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Create several tasks in a single INSERT and a single transaction."""
+
+    # 1. Préparer les lignes (un ULID par tâche, validation déjà faite par TaskCreate)
+    rows = [{"id": str(ULID()), **task_data.model_dump()} for task_data in tasks_data]
 
-    logger.info(f"Task created successfully: {task.id}")
-    return task
+    # 2. INSERT ... RETURNING en executemany : un aller-retour, un commit
+    stmt = insert(TaskModel).returning(TaskModel, sort_by_parameter_order=True)
+    result = await db.scalars(stmt, rows)
+    tasks = result.all()
+    await db.commit()
 
-@app.put("/tasks/{task_id}", response_model=Task)
-async def update_task(task_id: str, updates: TaskUpdate, db: Session = Depends(get_db)) -> Task:
+    logger.info("%d tasks created in bulk", len(tasks))
+    return json_response(TASKS_ADAPTER, tasks, status_code=201)
+
+@app.put("/tasks/{task_id}", response_model=None, responses={200: {"model": Task}})
+async def update_task(task_id: str, updates: TaskUpdate, db: AsyncSession = Depends(get_db)) -> Response:
     """Update an existing task (partial update supported)."""
     
-    # 1. Trouver la tâche
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
-    
-    if not task:
-        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-        
-    # 2. Extraire les champs à mettre à jour
+    # 1. Extraire les champs à mettre à jour
     update_data = updates.model_dump(exclude_unset=True)
 
-    # 3. Validation du titre (si fourni)
-    if "title" in update_data and (not update_data["title"] or not update_data["title"].strip()):
-        raise HTTPException(status_code=422, detail="Title cannot be empty")
+    # 2. Null explicite refusé sur les champs obligatoires, avant l'UPDATE (sinon ligne invalide commitée)
+    null_fields = [field for field in NON_NULLABLE_UPDATE_FIELDS if field in update_data and update_data[field] is None]
+    if null_fields:
+        raise HTTPException(status_code=422, detail=f"Fields cannot be null: {', '.join(null_fields)}")
+
+    # 3. Rien à modifier : renvoyer la tâche telle quelle
+    if not update_data:
+        task = await get_task_by_id(db, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return json_response(TASK_ADAPTER, task)
+
+    # 4. UPDATE ... RETURNING : mise à jour et relecture (updated_at compris) en un seul aller-retour
+    stmt = (
+        update(TaskModel)
+        .where(TaskModel.id == task_id)
+        .values(**update_data)
+        .returning(TaskModel)
+    )
+    task = (await db.execute(stmt)).scalar_one_or_none()
 
-    # 4. Appliquer les mises à jour
-    for key, value in update_data.items():
-        setattr(task, key, value) # Utilise setattr pour la mise à jour des champs
-    
-    # 5. Commiter et rafraîchir
-    db.commit()
-    db.refresh(task) # Recharge pour mettre à jour 'updated_at'
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+
+    # 5. Commiter (pas de refresh : RETURNING a déjà rapporté la ligne à jour)
+    await db.commit()
+    forget_task(task_id)
     
-    return task
+    return json_response(TASK_ADAPTER, task)
 
 
 @app.delete("/tasks/{task_id}", status_code=204)
-async def delete_task(task_id: str, db: Session = Depends(get_db)):
+async def delete_task(task_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a task by ID."""
     
     # 1. Trouver la tâche
-    task = db.query(TaskModel).filter(TaskModel.id == task_id).first()
+    task = await get_task_by_id(db, task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
         
     # 2. Supprimer la tâche et commiter
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
+    forget_task(task_id)
     
     return # Retourne 204 No Content
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # loop/http "auto" (défaut) : uvloop + httptools quand ils sont installés (uvicorn[standard],
+    # hors Windows pour uvloop), asyncio + h11 sinon
+    # Workers via WEB_CONCURRENCY (1 par défaut : le cache de GET /tasks/{task_id} est propre à
+    # chaque processus et se désactive au-delà d'un worker) ; l'app est passée en chaîne d'import
+    uvicorn.run(
+        "src.app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
\ No newline at end of file
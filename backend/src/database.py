@@ -1,42 +1,118 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import uuid
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 
 # Lire l'URL de la base de données depuis les variables d'environnement
 # Utilise SQLite en local par défaut si DATABASE_URL n'est pas définie
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./taskflow.db")
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./taskflow.db")
 
-# Configuration du moteur SQLAlchemy
+
+def to_async_url(url: str) -> str:
+    """Convertit une URL de base de données vers son driver asyncio (asyncpg / aiosqlite)."""
+    # Render et Railway fournissent des URLs "postgres://" ou "postgresql://"
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+DATABASE_URL = to_async_url(DATABASE_URL)
+
+# PgBouncer (pool_mode=transaction, port 6432) : c'est lui qui mutualise les connexions
+USE_PGBOUNCER = os.getenv("USE_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+
+# Configuration du moteur SQLAlchemy (asyncio)
 if DATABASE_URL.startswith("sqlite"):
     # SQLite (développement local)
-    engine = create_engine(
+    engine = create_async_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False} # Requis pour SQLite avec FastAPI
+        connect_args={"check_same_thread": False}, # Requis pour SQLite avec FastAPI
+        query_cache_size=1200,   # Cache des requêtes compilées
+    )
+elif USE_PGBOUNCER:
+    # PostgreSQL derrière PgBouncer : chaque connexion est rendue au bouncer dès la fin de la session
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        query_cache_size=1200,   # Cache des requêtes compilées
+        connect_args={
+            # Pas de prepared statements persistants : une transaction peut changer de connexion serveur
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        },
     )
 else:
     # PostgreSQL (production)
-    engine = create_engine(
+    engine = create_async_engine(
         DATABASE_URL,
-        pool_size=5,             # Réutilise les connexions pour améliorer les performances [cite: 698]
+        pool_size=20,            # Réutilise les connexions pour améliorer les performances [cite: 698]
         max_overflow=10,         # Permet un dépassement temporaire du pool
-        pool_pre_ping=True       # Vérifie la connexion avant de l'utiliser [cite: 699]
+        pool_timeout=30,         # Attente max (s) d'une connexion libre avant erreur
+        pool_pre_ping=True,      # Vérifie la connexion avant de l'utiliser [cite: 699]
+        pool_recycle=1800,       # Renouvelle les connexions après 30 min (coupures serveur/proxy)
+        query_cache_size=1200,   # Cache des requêtes compilées
     )
 
-# Factory de sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Factory de sessions asynchrones
+# expire_on_commit=False : les objets restent lisibles après commit sans nouveau SELECT
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Base pour les modèles ORM
 Base = declarative_base()
 
-def get_db():
-    """Générateur qui fournit une session de base de données (injection de dépendances)."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Générateur qui fournit une session de base de données asynchrone (injection de dépendances)."""
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def init_db():
+async def migrate_enum_columns(conn):
+    """Migration idempotente des colonnes status / priority vers le stockage par valeur ("todo").
+
+    Les bases créées avant values_callable stockent le nom de l'Enum ("TODO") et, sous PostgreSQL,
+    utilisent les anciens types taskstatus / taskpriority au lieu de task_status / task_priority.
+    """
+    from .models import TaskModel
+    table = TaskModel.__table__
+    for column in (table.c.status, table.c.priority):
+        if conn.dialect.name == "postgresql":
+            # create_all ne crée pas les types d'une table qui existe déjà
+            await conn.run_sync(column.type.create, checkfirst=True)
+            current_type = await conn.scalar(
+                text(
+                    "SELECT udt_name FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = :column"
+                ),
+                {"table": table.name, "column": column.name},
+            )
+            if current_type != column.type.name:
+                await conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE {column.type.name} "
+                    f"USING lower({column.name}::text)::{column.type.name}"
+                ))
+                # Ancien type généré sans name= (nom de la classe en minuscules)
+                if current_type == column.type.enum_class.__name__.lower():
+                    await conn.execute(text(f"DROP TYPE IF EXISTS {current_type}"))
+        else:
+            # SQLite : l'Enum est un VARCHAR, seules les valeurs sont à convertir
+            await conn.execute(text(
+                f"UPDATE {table.name} SET {column.name} = lower({column.name}) "
+                f"WHERE {column.name} <> lower({column.name})"
+            ))
+
+async def init_db():
     """Initialise la base de données en créant toutes les tables."""
     from . import models # Import des modèles pour créer les tables
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await migrate_enum_columns(conn)
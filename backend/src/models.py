@@ -1,5 +1,6 @@
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -19,6 +20,17 @@ class TaskPriority(str, Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+def enum_values(enum_cls):
+    """Valeurs stockées en base pour un Enum (utilisé par values_callable)."""
+    return [member.value for member in enum_cls]
+
+# SQLite stocke CURRENT_TIMESTAMP à la seconde ("AAAA-MM-JJ HH:MM:SS") : les dates liées en paramètre
+# (curseur de pagination) doivent avoir exactement le même format texte pour être comparables
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 # =============================================================================
 # MODÈLE ORM
 # =============================================================================
@@ -26,20 +38,36 @@ class TaskPriority(str, Enum):
 class TaskModel (Base):
     """Modèle SQLAlchemy pour la table tasks."""
     __tablename__ = "tasks" # Nom de la table dans la base de données
+    __table_args__ = (
+        # Index composite pour les filtres combinés de GET /tasks
+        Index("ix_tasks_status_priority_assignee", "status", "priority", "assignee"),
+        # Index de la pagination keyset de GET /tasks : ORDER BY (created_at, id) DESC et borne de curseur
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+    )
 
-    # L'ID est maintenant un String (UUID) pour la compatibilité avec PostgreSQL
+    # L'ID est un String : ULID (26 caractères) pour les nouvelles tâches, les anciens UUID restent valides
     id = Column(String, primary_key=True, index=True)
     
     title = Column(String(200), nullable=False)
     description = Column(String(1000), nullable=True)
     
     # Utilisation du type SQLEnum pour garantir la validité des valeurs
-    status = Column(SQLEnum(TaskStatus), default=TaskStatus.TODO)
-    priority = Column(SQLEnum (TaskPriority), default=TaskPriority.MEDIUM)
+    # values_callable : stocke la valeur ("todo") et non le nom ("TODO") de l'Enum Python
+    # status : pas d'index dédié, il est la 1re colonne de ix_tasks_status_priority_assignee
+    # index=True (priority, assignee) : les filtres de GET /tasks évitent un parcours séquentiel de la table
+    status = Column(
+        SQLEnum(TaskStatus, values_callable=enum_values, native_enum=True, name="task_status"),
+        default=TaskStatus.TODO,
+    )
+    priority = Column(
+        SQLEnum(TaskPriority, values_callable=enum_values, native_enum=True, name="task_priority"),
+        default=TaskPriority.MEDIUM,
+        index=True,
+    )
     
-    assignee = Column(String(100), nullable=True)
+    assignee = Column(String(100), nullable=True, index=True)
     due_date = Column (DateTime, nullable=True)
     
     # Timestamps gérés automatiquement par la base de données (server_default)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
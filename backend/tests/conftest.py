@@ -1,12 +1,12 @@
+import asyncio
 import pytest
 import tempfile
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 from src.database import Base, get_db
-from src.models import TaskModel
 from fastapi.testclient import TestClient
-from src.app import app
+from src.app import app, _TASK_CACHE, _TASK_GENERATIONS
 
 
 # =============================================================================
@@ -14,15 +14,34 @@ from src.app import app
 # =============================================================================
 
 TEST_DB_FILE = tempfile.mktemp(suffix=".db")
-TEST_DATABASE_URL = f"sqlite:///{TEST_DB_FILE}"
+TEST_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DB_FILE}"
 
-test_engine = create_engine(
+test_engine = create_async_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool, # Utilisé pour garantir un thread unique par test
+    poolclass=NullPool, # Une connexion par test : aiosqlite lie chaque connexion à sa boucle asyncio
 )
 
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+# SQLite : laisser SQLAlchemy gérer BEGIN lui-même, sinon les SAVEPOINT du driver ne fonctionnent pas
+@event.listens_for(test_engine.sync_engine, "connect")
+def _sqlite_disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def _sqlite_emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+async def _create_tables():
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def _drop_tables():
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
 
 
 # =============================================================================
@@ -32,41 +51,57 @@ TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_eng
 @pytest.fixture(scope="session")
 def setup_test_database():
     """Crée/détruit les tables une seule fois pour la session de tests."""
-    Base.metadata.create_all(bind=test_engine)
+    asyncio.run(_create_tables())
     yield
-    Base.metadata.drop_all(bind=test_engine)
+    asyncio.run(_drop_tables())
 
 @pytest.fixture(autouse=True)
-def clear_test_data(setup_test_database):
-    """Nettoie les données (DELETE FROM) entre chaque test."""
-    # S'assure que chaque test commence avec une base vide
-    db = TestSessionLocal()
-    db.query(TaskModel).delete()
-    db.commit()
-    db.close()
-    yield # Le yield ici permet de marquer le point de setup, mais le nettoyage est fait avant.
+def clear_task_cache():
+    """Vide le cache processus de GET /tasks/{task_id} (et ses compteurs) avant chaque test."""
+    _TASK_CACHE.clear() # Le cache ne doit pas survivre à la transaction annulée du test précédent
+    _TASK_GENERATIONS.clear()
+    yield
+
+@pytest.fixture
+def test_client(setup_test_database):
+    """TestClient FastAPI (lifespan démarré), sans surcharge de la base."""
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def db_connection(test_client):
+    """Connexion de test dans une transaction annulée à la fin du test (aucun DELETE)."""
+    # La connexion est ouverte sur la boucle du TestClient, celle qui exécute les requêtes
+    connection = test_client.portal.call(test_engine.connect)
+    transaction = test_client.portal.call(connection.begin)
+    try:
+        yield connection
+    finally:
+        # Annule tout ce que le test a écrit
+        test_client.portal.call(transaction.rollback)
+        test_client.portal.call(connection.close)
 
 @pytest.fixture
-def client(setup_test_database):
-    """Client de test FastAPI qui surcharge get_db pour utiliser la base de test."""
-    
-    # Fonction qui remplace get_db pour utiliser la base de test
-    def override_get_db():
-        db = TestSessionLocal()
-        try:
+def client(test_client, db_connection):
+    """Client de test FastAPI : chaque test tourne dans la transaction de db_connection."""
+
+    # Fonction qui remplace get_db : les commit de l'app deviennent des SAVEPOINT
+    # dans la transaction du test
+    async def override_get_db():
+        async with AsyncSession(
+            bind=db_connection,
+            join_transaction_mode="create_savepoint",
+            autoflush=False,
+            expire_on_commit=False,
+        ) as db:
             yield db
-        finally:
-            db.close()
-    
+
     # Surcharge la dépendance de production par la dépendance de test
     app.dependency_overrides[get_db] = override_get_db
-    
-    # Exécute le client de test
-    with TestClient(app) as c:
-        yield c
-        
-    # Nettoie la surcharge après tous les tests de la session
-    app.dependency_overrides.clear()
+    try:
+        yield test_client
+    finally:
+        app.dependency_overrides.clear()
 
 
 def pytest_configure(config):
@@ -9,7 +9,12 @@ Structure de chaque test :
 3. ASSERT - Vérifier la réponse
 """
 
+import base64
+
 import pytest
+from sqlalchemy import text
+
+from src.database import migrate_enum_columns
 
 
 # =============================================================================
@@ -41,6 +46,15 @@ def test_health_check(client):
     assert response.json()["status"] == "healthy"
 
 
+def test_health_check_reports_tasks_count(client):
+    """Le health check renvoie le nombre de tâches (exact sur SQLite)."""
+    client.post("/tasks", json={"title": "Compte-moi"})
+
+    response = client.get("/health")
+
+    assert response.json()["tasks_count"] == 1
+
+
 def test_create_task(client):
     """
     EXEMPLE : Tester un point de terminaison POST (création de données).
@@ -190,6 +204,15 @@ def test_create_task_empty_title(client):
     assert reponse.status_code == 422
 
 
+def test_create_and_update_task_blank_title(client):
+    """Un titre composé uniquement d'espaces est refusé (création et mise à jour)."""
+    assert client.post("/tasks", json={"title": "   "}).status_code == 422
+
+    task_id = client.post("/tasks", json={"title": "Titre valide"}).json()["id"]
+    assert client.put(f"/tasks/{task_id}", json={"title": "  "}).status_code == 422
+    assert client.put(f"/tasks/{task_id}", json={"title": None}).status_code == 422
+
+
 # EXERCICE 4 : Tester la validation - priorité invalide
 def test_update_task_with_invalid_priority(client):
     """
@@ -304,6 +327,172 @@ def test_task_lifecycle(client):
     assert get_resp_after_delete.status_code == 404
     
 
+@pytest.mark.parametrize("field", ["title", "status", "priority"])
+def test_update_required_field_to_null_is_rejected(client, field):
+    """Un null explicite sur un champ obligatoire renvoie 422 et ne modifie rien."""
+    task = client.post("/tasks", json={"title": "Intacte"}).json()
+
+    response = client.put(f"/tasks/{task['id']}", json={field: None})
+
+    assert response.status_code == 422
+    assert client.get(f"/tasks/{task['id']}").json() == task
+
+
+def test_update_nonexistent_task_returns_404(client):
+    """Mettre à jour une tâche inexistante renvoie 404, avec ou sans champs."""
+    assert client.put("/tasks/inexistante", json={"status": "done"}).status_code == 404
+    assert client.put("/tasks/inexistante", json={}).status_code == 404
+
+
+def test_update_task_without_fields_returns_task_unchanged(client):
+    """Un PUT sans champ renvoie la tâche inchangée."""
+    task = client.post("/tasks", json={"title": "Stable"}).json()
+
+    response = client.put(f"/tasks/{task['id']}", json={})
+
+    assert response.status_code == 200
+    assert response.json() == task
+
+
+def test_get_task_after_update_returns_fresh_data(client):
+    """Une tâche déjà lue (donc en cache) reflète la mise à jour suivante."""
+    task_id = client.post("/tasks", json={"title": "Avant"}).json()["id"]
+    assert client.get(f"/tasks/{task_id}").json()["title"] == "Avant"
+
+    client.put(f"/tasks/{task_id}", json={"title": "Après"})
+
+    assert client.get(f"/tasks/{task_id}").json()["title"] == "Après"
+
+
+def test_get_task_not_cached_when_written_during_load(client, monkeypatch):
+    """Une écriture pendant le chargement d'un GET empêche de mettre en cache une version périmée."""
+    from src import app as app_module
+
+    task_id = client.post("/tasks", json={"title": "Course"}).json()["id"]
+    load_task = app_module.get_task_by_id
+
+    async def load_then_concurrent_write(db, tid):
+        task = await load_task(db, tid)
+        app_module.forget_task(tid) # Simule un PUT/DELETE commité pendant l'await
+        return task
+
+    monkeypatch.setattr(app_module, "get_task_by_id", load_then_concurrent_write)
+
+    assert client.get(f"/tasks/{task_id}").status_code == 200
+    assert task_id not in app_module._TASK_CACHE
+
+
+# Création en lot
+def test_create_tasks_bulk(client):
+    """POST /tasks:bulk crée toutes les tâches et les renvoie dans l'ordre envoyé."""
+    payload = [
+        {"title": "Lot 1"},
+        {"title": "Lot 2", "status": "done", "priority": "high"},
+        {"title": "Lot 3", "assignee": "oussama"},
+    ]
+
+    response = client.post("/tasks:bulk", json=payload)
+
+    assert response.status_code == 201
+    created = response.json()
+    assert [task["title"] for task in created] == ["Lot 1", "Lot 2", "Lot 3"]
+    assert created[1]["status"] == "done"
+    assert created[0]["created_at"] is not None
+    assert len(client.get("/tasks").json()) == 3
+
+
+def test_create_tasks_bulk_invalid_item(client):
+    """Un seul élément invalide rejette tout le lot."""
+    response = client.post("/tasks:bulk", json=[{"title": "OK"}, {"title": ""}])
+    assert response.status_code == 422
+    assert client.get("/tasks").json() == []
+
+
+# Pagination keyset de GET /tasks
+def test_list_tasks_paginated(client):
+    """Les pages successives couvrent toutes les tâches, sans doublon."""
+    created_ids = {client.post("/tasks", json={"title": f"Tâche {i}"}).json()["id"] for i in range(5)}
+
+    first_page = client.get("/tasks?limit=2")
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get(f"/tasks?limit=2&cursor={cursor}")
+    third_page = client.get(f"/tasks?limit=2&cursor={second_page.headers['X-Next-Cursor']}")
+    assert len(third_page.json()) == 1
+    assert "X-Next-Cursor" not in third_page.headers
+
+    seen_ids = [task["id"] for page in (first_page, second_page, third_page) for task in page.json()]
+    assert len(seen_ids) == len(set(seen_ids))
+    assert set(seen_ids) == created_ids
+
+
+def test_list_tasks_cursor_survives_deleted_task(client):
+    """Supprimer la tâche désignée par le curseur n'interrompt pas la pagination."""
+    for i in range(5):
+        client.post("/tasks", json={"title": f"Tâche {i}"})
+
+    first_page = client.get("/tasks?limit=2")
+    client.delete(f"/tasks/{first_page.json()[-1]['id']}")
+
+    next_page = client.get(f"/tasks?limit=2&cursor={first_page.headers['X-Next-Cursor']}")
+
+    assert next_page.status_code == 200
+    assert len(next_page.json()) == 2
+
+
+def test_list_tasks_invalid_cursor(client):
+    """Un curseur illisible est refusé avec 400."""
+    response = client.get("/tasks?cursor=garbage")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_list_tasks_cursor_with_timezone_is_rejected(client):
+    """Un curseur modifié avec une date à fuseau horaire est refusé avec 400."""
+    cursor = base64.urlsafe_b64encode(b"2024-01-01T00:00:00+05:00|x").decode().rstrip("=")
+
+    response = client.get(f"/tasks?cursor={cursor}")
+
+    assert response.status_code == 400
+
+
+def test_list_tasks_limit_out_of_range(client):
+    """Une taille de page hors bornes est refusée."""
+    assert client.get("/tasks?limit=0").status_code == 422
+    assert client.get("/tasks?limit=501").status_code == 422
+
+
+def test_task_enums_stored_by_value(client, db_connection):
+    """La base stocke la valeur de l'Enum ("todo") et non son nom ("TODO")."""
+    task_id = client.post("/tasks", json={"title": "Stored"}).json()["id"]
+
+    row = client.portal.call(
+        db_connection.execute,
+        text("SELECT status, priority FROM tasks WHERE id = :id"),
+        {"id": task_id},
+    ).one()
+
+    assert tuple(row) == ("todo", "medium")
+
+
+def test_migrate_enum_columns_converts_legacy_names(client, db_connection):
+    """Une tâche écrite avant values_callable ("TODO") redevient lisible après la migration."""
+    client.portal.call(
+        db_connection.execute,
+        text("INSERT INTO tasks (id, title, status, priority) VALUES ('legacy', 'Legacy', 'TODO', 'HIGH')"),
+    )
+
+    client.portal.call(migrate_enum_columns, db_connection)
+
+    response = client.get("/tasks/legacy")
+    assert response.status_code == 200
+    assert response.json()["status"] == "todo"
+    assert response.json()["priority"] == "high"
+
+
 
 # =============================================================================
 # ASTUCES & CONSEILS
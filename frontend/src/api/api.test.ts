@@ -18,6 +18,7 @@ describe('API Module', () => {
     (globalThis as any).fetch = vi.fn(() =>
       Promise.resolve({
         ok: true,
+        headers: new Headers(), // Pas de X-Next-Cursor : une seule page
         json: () => Promise.resolve([
           { id: 1, title: 'Test Task', status: 'todo' }
         ]),
@@ -30,6 +31,32 @@ describe('API Module', () => {
     expect(tasks[0].title).toBe('Test Task');
   });
 
+  /**
+   * Le backend pagine GET /tasks : getTasks() suit X-Next-Cursor jusqu'à la dernière page
+   */
+  it('follows the pagination cursor and returns tasks oldest first', async () => {
+    (globalThis as any).fetch = vi.fn()
+      .mockResolvedValueOnce({
+        ok: true,
+        headers: new Headers({ 'X-Next-Cursor': 'abc' }),
+        json: () => Promise.resolve([{ id: 3, title: 'C' }, { id: 2, title: 'B' }]),
+      })
+      .mockResolvedValueOnce({
+        ok: true,
+        headers: new Headers(),
+        json: () => Promise.resolve([{ id: 1, title: 'A' }]),
+      });
+
+    const tasks = await api.getTasks();
+
+    expect(tasks.map(task => task.title)).toEqual(['A', 'B', 'C']);
+    expect((globalThis as any).fetch).toHaveBeenCalledTimes(2);
+    expect((globalThis as any).fetch).toHaveBeenLastCalledWith(
+      '/api/tasks?limit=500&cursor=abc',
+      expect.anything()
+    );
+  });
+
   /**
    * Test 2 : Vérifier que l'API peut créer des tâches
    * Montre comment tester les requêtes POST
@@ -3,8 +3,14 @@ import { Task, TaskCreate, TaskUpdate, TaskStatus, TaskPriority } from '../types
 // API Base URL - use environment variable in production or proxy in development
 const API_BASE = import.meta.env.VITE_API_URL || '/api';
 
-// Helper function for API calls
-async function apiRequest<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+// Largest page accepted by GET /tasks
+const TASKS_PAGE_SIZE = 500;
+
+// Helper function for API calls - returns the parsed body along with the response headers
+async function apiRequestWithHeaders<T>(
+  endpoint: string,
+  options: RequestInit = {}
+): Promise<{ data: T; headers: Headers }> {
   const url = `${API_BASE}${endpoint}`;
 
   const response = await fetch(url, {
@@ -19,12 +25,21 @@ async function apiRequest<T>(endpoint: string, options: RequestInit = {}): Promi
     throw new Error(`API error: ${response.status} ${response.statusText}`);
   }
 
-  return response.json();
+  return { data: await response.json(), headers: response.headers };
+}
+
+// Helper function for API calls
+async function apiRequest<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+  const { data } = await apiRequestWithHeaders<T>(endpoint, options);
+  return data;
 }
 
 // Task API functions
 export const api = {
-  // Get all tasks with optional filters
+  // Get all tasks with optional filters.
+  // GET /tasks is paginated, but the UI has no pagination controls and lists every task:
+  // to keep that behaviour this deliberately follows X-Next-Cursor through all pages,
+  // using the largest page size to keep the number of round-trips low.
   async getTasks(
     status?: TaskStatus,
     priority?: TaskPriority,
@@ -34,11 +49,20 @@ export const api = {
     if (status) params.append('status', status);
     if (priority) params.append('priority', priority);
     if (assignee) params.append('assignee', assignee);
+    params.append('limit', String(TASKS_PAGE_SIZE));
 
-    const query = params.toString();
-    const endpoint = `/tasks${query ? `?${query}` : ''}`;
+    const tasks: Task[] = [];
+    let cursor: string | null = null;
+    do {
+      if (cursor) params.set('cursor', cursor);
+      const { data, headers } = await apiRequestWithHeaders<Task[]>(`/tasks?${params.toString()}`);
+      tasks.push(...data);
+      // X-Next-Cursor is only sent when more tasks remain
+      cursor = headers.get('X-Next-Cursor');
+    } while (cursor);
 
-    return apiRequest<Task[]>(endpoint);
+    // The API returns newest first; the UI lists tasks in creation order
+    return tasks.reverse();
   },
 
   // Get single task